@@ -1,35 +1,54 @@
 import os
 import time
 import tempfile
-import uuid
+import secrets
+import asyncio
 import threading
-import queue
+import wave
 import traceback
+import logging
+import logging.handlers
+import queue
 from email.message import EmailMessage
 
 import sys
 if sys.platform == "win32":
     try:
-        import asyncio
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     except Exception:
         pass
 
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from typing import Optional
 from fastapi import FastAPI, UploadFile, File, Form
 from fastapi.responses import JSONResponse
 import uvicorn
 
-import whisper
-import torch
-from pydub import AudioSegment
+import numpy as np
+import av
+
+from faster_whisper import WhisperModel, BatchedInferencePipeline, decode_audio
+import ctranslate2
 import smtplib
 
 MODEL_NAME = os.getenv("MODEL_NAME", "tiny")  
-SEG_LEN_SECONDS = int(os.getenv("SEG_LEN_SECONDS", "20"))
+WHISPER_BACKEND = os.getenv("WHISPER_BACKEND", "faster-whisper")  # or "whispercpp" (CPU only)
+WHISPERCPP_MODEL = os.getenv("WHISPERCPP_MODEL", MODEL_NAME)  # e.g. "tiny.en-q5_0"
+WHISPERCPP_MODELS_DIR = os.getenv("WHISPERCPP_MODELS_DIR", "./models")
+COMPUTE_TYPE = os.getenv("COMPUTE_TYPE")
+NUM_WORKERS = int(os.getenv("NUM_WORKERS", "0"))  # 0 = pick from device
+CPU_THREADS = int(os.getenv("CPU_THREADS", "0"))  # 0 = all cores, split if NUM_WORKERS is set
 CHUNK_THRESHOLD_S = int(os.getenv("CHUNK_THRESHOLD_S", "40"))
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "16"))
+VAD_MIN_SILENCE_MS = int(os.getenv("VAD_MIN_SILENCE_MS", "500"))
+VAD_PARAMETERS = {"min_silence_duration_ms": VAD_MIN_SILENCE_MS}
+SAMPLE_RATE = 16000
 MAX_UPLOAD_S = int(os.getenv("MAX_UPLOAD_S", "600"))
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"
+UPLOAD_CHUNK_BYTES = 1 << 20
+TMPDIR = tempfile.gettempdir()
 PORT = int(os.getenv("PORT", "8000"))
 
 SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
@@ -40,79 +59,255 @@ SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
 EMAIL_FROM = SMTP_USERNAME if SMTP_USERNAME else "no-reply@example.com"
 EMAIL_SUBJECT_TEMPLATE = "Your transcription (job {job_id})"
 
-job_q = queue.Queue()
-WORKER_THREAD = None
-SHUTDOWN_EVENT = threading.Event()
+def setup_logging():
+    """
+    Route log records through a QueueHandler so request/worker threads only
+    enqueue; a QueueListener thread does the actual stdout writes.
+    """
+    root = logging.getLogger()
+    for h in root.handlers:
+        if isinstance(h, logging.handlers.QueueHandler):
+            return None
+    log_q = queue.Queue(-1)
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
+    listener = logging.handlers.QueueListener(log_q, stream)
+    root.addHandler(logging.handlers.QueueHandler(log_q))
+    root.setLevel(logging.INFO)
+    listener.start()
+    return listener
+
+LOG_LISTENER = setup_logging()
+log = logging.getLogger("app")
+worker_log = logging.getLogger("worker")
+email_log = logging.getLogger("email")
+
+_SMTP_CLIENT = None
+_SMTP_LOCK = threading.Lock()
+
+# Strong references to in-flight job tasks so they are not garbage collected.
+BACKGROUND_TASKS = set()
 
 def get_device():
-    return "cuda" if torch.cuda.is_available() else "cpu"
+    return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+
+def get_compute_type(device):
+    """
+    int8 weights on CPU, float16 on CUDA, unless COMPUTE_TYPE overrides it
+    (e.g. "int8_float16" on GPU, "float32" to disable quantization).
+    """
+    if COMPUTE_TYPE:
+        return COMPUTE_TYPE
+    return "int8" if device == "cpu" else "float16"
 
-print(f"[app] Loading Whisper model '{MODEL_NAME}' (this may download weights)...")
+def get_num_workers(device):
+    """
+    Number of jobs transcribed concurrently (size of TRANSCRIBE_SEM). On CUDA,
+    2 so one job's CPU-side work overlaps another's GPU decode. On CPU, 1: the
+    batched pipeline already keeps every core busy within a single job, so
+    multi-job concurrency is opt-in via NUM_WORKERS.
+    """
+    if NUM_WORKERS > 0:
+        return NUM_WORKERS
+    if device == "cuda":
+        return 2
+    return 1
+
+def get_cpu_threads(num_workers):
+    """
+    Intra-op threads per CTranslate2 worker: every core by default, split
+    evenly across workers only when NUM_WORKERS asks for concurrency.
+    """
+    if CPU_THREADS > 0:
+        return CPU_THREADS
+    cores = os.cpu_count() or 4
+    if NUM_WORKERS > 0:
+        return max(1, cores // num_workers)
+    return cores
+
+if WHISPER_BACKEND not in ("faster-whisper", "whispercpp"):
+    raise ValueError(f"Unknown WHISPER_BACKEND {WHISPER_BACKEND!r}; expected 'faster-whisper' or 'whispercpp'.")
 device = get_device()
-model = whisper.load_model(MODEL_NAME, device=device)
-print(f"[app] Model '{MODEL_NAME}' loaded on {device}.")
+use_whispercpp = WHISPER_BACKEND == "whispercpp" and device == "cpu"
+if WHISPER_BACKEND == "whispercpp" and not use_whispercpp:
+    log.warning("WHISPER_BACKEND=whispercpp is CPU only; using faster-whisper on %s instead.", device)
+if use_whispercpp:
+    # whisper.cpp is not safe to call concurrently and uses every core itself.
+    from pywhispercpp.model import Model as WhisperCppModel
+    num_workers = 1
+    cpu_threads = CPU_THREADS or os.cpu_count() or 4
+    log.info("Loading whisper.cpp model '%s' (this may download weights)...", WHISPERCPP_MODEL)
+    model = WhisperCppModel(WHISPERCPP_MODEL, models_dir=WHISPERCPP_MODELS_DIR, n_threads=cpu_threads)
+    batched_model = None
+    log.info("whisper.cpp model '%s' loaded (%d threads).", WHISPERCPP_MODEL, cpu_threads)
+else:
+    compute_type = get_compute_type(device)
+    num_workers = get_num_workers(device)
+    cpu_threads = get_cpu_threads(num_workers)
+    log.info("Loading Whisper model '%s' (this may download weights)...", MODEL_NAME)
+    model = WhisperModel(
+        MODEL_NAME,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        num_workers=num_workers,
+    )
+    batched_model = BatchedInferencePipeline(model=model)
+    log.info("Model '%s' loaded on %s (%s, %d workers x %d threads).",
+             MODEL_NAME, device, compute_type, num_workers, cpu_threads)
+# Created in lifespan() so they bind to uvicorn's event loop (Python < 3.10
+# binds asyncio primitives to the loop current at construction time).
+TRANSCRIBE_SEM = None
+# Jobs allowed to hold decoded audio at once: the ones transcribing plus one
+# prefetched per worker, so decoding the next upload overlaps inference.
+PREFETCH_SEM = None
+# Dedicated threads for inference, so long transcriptions cannot starve the
+# loop's default executor used by probing and email sends.
+TRANSCRIBE_EXECUTOR = None
+
+def warmup_model():
+    """
+    Run one second of silence through the single-pass and batched paths so the
+    first real job does not pay for lazy kernel/allocator initialisation. VAD
+    is off so the encoder and decoder actually run.
+    """
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    transcribe_chunk(silence, vad_filter=False)
+    if batched_model is not None:
+        list(transcribe_batched(silence, vad_filter=False))
 
-def ensure_wav_copy(in_path):
+def probe_duration(in_path):
     """
-    Convert input audio to WAV file in tempdir and return path + duration_s.
+    Return the duration of in_path in seconds from the WAV header or the
+    container metadata (PyAV). Streams that carry no duration (e.g. browser
+    MediaRecorder WebM) are decoded and their samples counted. Raises if the
+    file cannot be opened as audio.
     """
-    tmpdir = tempfile.gettempdir()
-    out_path = os.path.join(tmpdir, f"whisper_input_{uuid.uuid4().hex}.wav")
-    audio = AudioSegment.from_file(in_path)
-    audio.export(out_path, format="wav")
-    return out_path, len(audio) / 1000.0
-
-def split_audio_to_files(audio_path, seg_len_s=SEG_LEN_SECONDS):
-    audio = AudioSegment.from_file(audio_path)
-    duration_ms = len(audio)
-    seg_len_ms = int(seg_len_s * 1000)
-    out_files = []
-    base_ts = int(time.time())
-    for i, start_ms in enumerate(range(0, duration_ms, seg_len_ms)):
-        end_ms = min(start_ms + seg_len_ms, duration_ms)
-        chunk = audio[start_ms:end_ms]
-        out_path = os.path.join(tempfile.gettempdir(), f"whisper_chunk_{base_ts}_{uuid.uuid4().hex}_{i}.wav")
-        chunk.export(out_path, format="wav")
-        out_files.append(out_path)
-    return out_files
-
-def transcribe_chunk(path):
-    res = model.transcribe(path)
-    return res.get("text", "").strip()
-
-def transcribe_file(audio_path):
+    try:
+        with wave.open(in_path, "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except (wave.Error, EOFError):
+        pass
+    with av.open(in_path) as container:
+        if container.duration is not None:
+            return container.duration / av.time_base
+        for stream in container.streams.audio:
+            if stream.duration is not None and stream.time_base is not None:
+                return float(stream.duration * stream.time_base)
+    return len(decode_audio(in_path, sampling_rate=SAMPLE_RATE)) / SAMPLE_RATE
+
+def read_native_wav(in_path):
     """
-    Transcribe audio_path (auto-chunk if long). Returns the transcript string.
+    Return samples as float32 if in_path is already a 16 kHz mono PCM16 WAV
+    (Whisper's native format), else None.
     """
-    wav_path, duration_s = ensure_wav_copy(audio_path)
     try:
-        if duration_s > CHUNK_THRESHOLD_S:
-            parts = []
-            out_paths = split_audio_to_files(wav_path, seg_len_s=SEG_LEN_SECONDS)
-            for idx, p in enumerate(out_paths, start=1):
-                try:
-                    txt = transcribe_chunk(p)
-                except Exception as e:
-                    txt = f"[ERROR transcribing chunk {idx}: {e}]"
-                parts.append(txt)
-                try:
-                    os.remove(p)
-                except Exception:
-                    pass
-            joined = "\n\n".join([p for p in parts if p])
-            summary = f"(Chunked — {len(out_paths)} chunks, original duration {duration_s:.1f}s)"
-            return summary + "\n\n" + joined
-        else:
-            res = model.transcribe(wav_path)
-            text = res.get("text", "").strip()
-            summary = f"(Single-pass — duration {duration_s:.1f}s)"
-            return summary + "\n\n" + text
-    finally:
+        with wave.open(in_path, "rb") as w:
+            if w.getframerate() != SAMPLE_RATE or w.getnchannels() != 1 or w.getsampwidth() != 2:
+                return None
+            pcm = w.readframes(w.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+
+def load_audio(in_path):
+    """
+    Decode in_path once into a mono float32 array at SAMPLE_RATE.
+    Native-format WAVs are read directly, skipping decode and resampling.
+    """
+    audio = read_native_wav(in_path)
+    if audio is not None:
+        return audio
+    return decode_audio(in_path, sampling_rate=SAMPLE_RATE)
+
+def transcribe_chunk(audio, vad_filter=True):
+    if use_whispercpp:
+        return " ".join(s.text.strip() for s in model.transcribe(audio)).strip()
+    segments, _info = model.transcribe(
+        audio, beam_size=1, vad_filter=vad_filter, vad_parameters=VAD_PARAMETERS
+    )
+    return " ".join(s.text.strip() for s in segments).strip()
+
+def transcribe_batched(audio, vad_filter=True):
+    """
+    Split the audio on silences (Silero VAD) and run the speech segments
+    through the model in batches; silent stretches never reach the encoder.
+    """
+    segments, _info = batched_model.transcribe(
+        audio, batch_size=BATCH_SIZE, beam_size=1, vad_filter=vad_filter, vad_parameters=VAD_PARAMETERS
+    )
+    return segments
+
+def transcribe_audio(audio):
+    """
+    Transcribe a decoded float32 array at SAMPLE_RATE (batched over VAD
+    segments if long). Returns the transcript string.
+    """
+    duration_s = len(audio) / SAMPLE_RATE
+    if batched_model is not None and duration_s > CHUNK_THRESHOLD_S:
+        segments = list(transcribe_batched(audio))
+        joined = "\n\n".join([s.text.strip() for s in segments if s.text.strip()])
+        summary = f"(Batched — {len(segments)} segments, original duration {duration_s:.1f}s)"
+        return summary + "\n\n" + joined
+    else:
+        text = transcribe_chunk(audio)
+        summary = f"(Single-pass — duration {duration_s:.1f}s)"
+        return summary + "\n\n" + text
+
+def _smtp_connect():
+    smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30)
+    try:
+        smtp.ehlo()
+        smtp.starttls()
+        smtp.ehlo()
+        smtp.login(SMTP_USERNAME, SMTP_PASSWORD)
+    except Exception:
+        smtp.close()
+        raise
+    return smtp
+
+def _smtp_close():
+    global _SMTP_CLIENT
+    if _SMTP_CLIENT is not None:
         try:
-            if wav_path and os.path.exists(wav_path):
-                os.remove(wav_path)
+            _SMTP_CLIENT.quit()
         except Exception:
-            pass
+            _SMTP_CLIENT.close()
+        _SMTP_CLIENT = None
+
+def _smtp_session_dropped(e):
+    """
+    True if e means the server closed the session (disconnect or 421), i.e.
+    the message was not accepted and a fresh session may be tried.
+    """
+    if isinstance(e, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(e, smtplib.SMTPResponseException) and e.smtp_code == 421
+
+def smtp_send(msg):
+    """
+    Send msg over a shared, lazily opened SMTP session. A reused session the
+    server has dropped is reopened once; other errors propagate to the caller.
+    SMTP-level errors (bad recipient, auth, data) keep the session; socket
+    errors discard it without resending, since delivery state is unknown.
+    """
+    global _SMTP_CLIENT
+    with _SMTP_LOCK:
+        reused = _SMTP_CLIENT is not None
+        while True:
+            if _SMTP_CLIENT is None:
+                _SMTP_CLIENT = _smtp_connect()
+            try:
+                _SMTP_CLIENT.send_message(msg)
+                return
+            except Exception as e:
+                dropped = _smtp_session_dropped(e)
+                if dropped or not isinstance(e, smtplib.SMTPException):
+                    _SMTP_CLIENT.close()
+                    _SMTP_CLIENT = None
+                if not (dropped and reused):
+                    raise
+                reused = False
 
 def send_email_with_fallback(to_address: str, subject: str, body_text: str,
                              attachments: list = None, fallback_save_path: str = None):
@@ -131,18 +326,13 @@ def send_email_with_fallback(to_address: str, subject: str, body_text: str,
             msg.add_attachment(data_bytes, maintype=maintype, subtype=subtype, filename=fname)
 
     try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30) as smtp:
-            smtp.ehlo()
-            smtp.starttls()
-            smtp.ehlo()
-            smtp.login(SMTP_USERNAME, SMTP_PASSWORD)
-            smtp.send_message(msg)
-        print(f"[email] Sent to {to_address}")
+        smtp_send(msg)
+        email_log.info("Sent to %s", to_address)
         return True, None
     except Exception as e:
         err = f"SMTP send error: {e}\n{traceback.format_exc()}"
 
-    print("[email] Send failed:", err)
+    email_log.error("Send failed: %s", err)
     if fallback_save_path:
         try:
             if attachments and attachments[0] and attachments[0][1]:
@@ -151,65 +341,84 @@ def send_email_with_fallback(to_address: str, subject: str, body_text: str,
             else:
                 with open(fallback_save_path, "wb") as f:
                     f.write(body_text.encode("utf-8"))
-            print(f"[email] Saved fallback transcript at: {fallback_save_path}")
+            email_log.info("Saved fallback transcript at: %s", fallback_save_path)
         except Exception as e:
-            print("[email] Fallback save failed:", e)
+            email_log.error("Fallback save failed: %s", e)
     return False, err
 
-def worker_loop():
-    print("[worker] Background worker started, waiting for jobs...")
-    while not SHUTDOWN_EVENT.is_set():
-        try:
-            job = job_q.get(timeout=1.0)
-        except queue.Empty:
-            continue
-        try:
-            job_id = job.get("job_id")
-            email = job.get("email")
-            audio_path = job.get("audio_path")
-            original_filename = job.get("filename", "upload")
-
-            print(f"[worker] Processing job {job_id} (file={original_filename}, email={email})")
+async def process_job(job):
+    job_id = job.get("job_id")
+    email = job.get("email")
+    audio_path = job.get("audio_path")
+    original_filename = job.get("filename", "upload")
 
+    try:
+        async with PREFETCH_SEM:
             try:
-                transcript = transcribe_file(audio_path)
+                audio = await asyncio.to_thread(load_audio, audio_path)
+                async with TRANSCRIBE_SEM:
+                    worker_log.info("Processing job %s (file=%s, email=%s)", job_id, original_filename, email)
+                    transcript = await asyncio.get_running_loop().run_in_executor(
+                        TRANSCRIBE_EXECUTOR, transcribe_audio, audio
+                    )
             except Exception as e:
                 transcript = f"[ERROR] Transcription failed: {e}\n\n{traceback.format_exc()}"
-                print(f"[worker] Transcription error for job {job_id}: {e}")
-
-            subject = EMAIL_SUBJECT_TEMPLATE.format(job_id=job_id)
-            body = f"Hello,\n\nAttached is the transcription for job {job_id} (file: {original_filename}).\n\n--- Transcript below ---\n\n{transcript}\n\nRegards,\nYour Transcription Server"
-
-            fallback_path = os.path.join(tempfile.gettempdir(), f"transcript_fallback_{job_id}.txt")
-            ok, err = send_email_with_fallback(
-                email,
-                subject,
-                body,
-                attachments=[(f"transcript_{job_id}.txt", transcript.encode("utf-8"), "text/plain")],
-                fallback_save_path=fallback_path
-            )
-            if not ok:
-                print(f"[worker] Email failed for job {job_id}. Saved fallback at: {fallback_path}. Error: {err}")
-            else:
-                print(f"[worker] Email successfully sent for job {job_id} -> {email}")
-
-           
-            try:
-                if os.path.exists(audio_path):
-                    os.remove(audio_path)
-            except Exception:
-                pass
+                worker_log.error("Transcription error for job %s: %s", job_id, e)
+            audio = None  # drop the samples before the email round-trip
+
+        subject = EMAIL_SUBJECT_TEMPLATE.format(job_id=job_id)
+        body = f"Hello,\n\nAttached is the transcription for job {job_id} (file: {original_filename}).\n\nRegards,\nYour Transcription Server"
+        transcript_bytes = transcript.encode("utf-8")
+
+        fallback_path = os.path.join(TMPDIR, f"transcript_fallback_{job_id}.txt")
+        ok, err = await asyncio.to_thread(
+            send_email_with_fallback,
+            email,
+            subject,
+            body,
+            attachments=[(f"transcript_{job_id}.txt", transcript_bytes, "text/plain")],
+            fallback_save_path=fallback_path
+        )
+        if not ok:
+            worker_log.error("Email failed for job %s. Saved fallback at: %s. Error: %s", job_id, fallback_path, err)
+        else:
+            worker_log.info("Email successfully sent for job %s -> %s", job_id, email)
 
-        finally:
-            job_q.task_done()
+    finally:
+        try:
+            if os.path.exists(audio_path):
+                os.remove(audio_path)
+        except Exception:
+            pass
 
-def start_worker():
-    global WORKER_THREAD
-    if WORKER_THREAD is None or not WORKER_THREAD.is_alive():
-        WORKER_THREAD = threading.Thread(target=worker_loop, daemon=True, name="transcribe-worker")
-        WORKER_THREAD.start()
+def start_job(job):
+    task = asyncio.create_task(process_job(job), name=f"job-{job['job_id']}")
+    BACKGROUND_TASKS.add(task)
+    task.add_done_callback(BACKGROUND_TASKS.discard)
+
+@asynccontextmanager
+async def lifespan(app):
+    global TRANSCRIBE_SEM, PREFETCH_SEM, TRANSCRIBE_EXECUTOR
+    TRANSCRIBE_SEM = asyncio.Semaphore(num_workers)
+    PREFETCH_SEM = asyncio.Semaphore(2 * num_workers)
+    TRANSCRIBE_EXECUTOR = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="transcribe")
+    if MODEL_WARMUP:
+        t0 = time.time()
+        await asyncio.get_running_loop().run_in_executor(TRANSCRIBE_EXECUTOR, warmup_model)
+        log.info("Model warm-up done in %.1fs.", time.time() - t0)
+    try:
+        yield
+    finally:
+        pending = [t for t in BACKGROUND_TASKS if not t.done()]
+        if pending:
+            log.warning("Shutting down with %d unfinished job(s), dropping: %s",
+                        len(pending), ", ".join(t.get_name() for t in pending))
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        TRANSCRIBE_EXECUTOR.shutdown(wait=False, cancel_futures=True)
 
-app = FastAPI(title="Audio Transcription API")
+app = FastAPI(title="Audio Transcription API", lifespan=lifespan)
 
 @app.post("/api/submit")
 async def submit(email: str = Form(...), audio: UploadFile = File(...)):
@@ -219,24 +428,27 @@ async def submit(email: str = Form(...), audio: UploadFile = File(...)):
 
    
     suffix = os.path.splitext(audio.filename)[1] or ".wav"
-    dest = os.path.join(tempfile.gettempdir(), f"upload_{uuid.uuid4().hex}{suffix}")
+    dest = os.path.join(TMPDIR, f"upload_{secrets.token_hex(16)}{suffix}")
     with open(dest, "wb") as f:
-        f.write(await audio.read())
+        while chunk := await audio.read(UPLOAD_CHUNK_BYTES):
+            f.write(chunk)
 
    
     try:
-        a = AudioSegment.from_file(dest)
-        duration_s = len(a) / 1000.0
-        if duration_s > MAX_UPLOAD_S:
-            try:
-                os.remove(dest)
-            except:
-                pass
-            return JSONResponse({"error": f"Uploaded audio too long ({duration_s:.1f}s). Max {MAX_UPLOAD_S}s."}, status_code=400)
-    except Exception:
+        duration_s = await asyncio.to_thread(probe_duration, dest)
+    except Exception as e:
+        log.warning("Rejected upload %s: could not read duration: %s", audio.filename, e)
         duration_s = None
+    if duration_s is None or duration_s > MAX_UPLOAD_S:
+        try:
+            os.remove(dest)
+        except:
+            pass
+        if duration_s is None:
+            return JSONResponse({"error": "Could not read uploaded audio."}, status_code=400)
+        return JSONResponse({"error": f"Uploaded audio too long ({duration_s:.1f}s). Max {MAX_UPLOAD_S}s."}, status_code=400)
 
-    job_id = uuid.uuid4().hex[:12]
+    job_id = secrets.token_hex(6)
     job = {
         "job_id": job_id,
         "email": email,
@@ -244,8 +456,7 @@ async def submit(email: str = Form(...), audio: UploadFile = File(...)):
         "filename": audio.filename,
         "submitted_at": time.time()
     }
-    job_q.put(job)
-    start_worker()
+    start_job(job)
 
     return {"message": f"Job accepted (ID: {job_id}). Check email (or fallback file).", "job_id": job_id}
 
@@ -256,12 +467,13 @@ def health():
 
 import atexit
 def shutdown():
-    SHUTDOWN_EVENT.set()
-    if WORKER_THREAD:
-        WORKER_THREAD.join(timeout=2.0)
+    with _SMTP_LOCK:
+        _smtp_close()
+    if LOG_LISTENER:
+        LOG_LISTENER.stop()
 atexit.register(shutdown)
 
 
 if __name__ == "__main__":
-    print(f"[app] Starting API on port {PORT} ...")
+    log.info("Starting API on port %d ...", PORT)
     uvicorn.run("app:app", host="127.0.0.1", port=PORT, log_level="info", reload=False)